@@ -5,24 +5,23 @@ Run this locally to authenticate and create the cache file.
 """
 
 import os
+import logging
 import msal
 import dotenv
 
 # Load environment variables
-import os
-import msal
-import dotenv
-
 dotenv.load_dotenv("config.env")
 
 CLIENT_ID = os.getenv('MS_CLIENT_ID')
 TENANT_ID = os.getenv('MS_TENANT_ID')
 CACHE_FILE = os.path.join(os.path.dirname(__file__), 'msal_token_cache.bin')
 
+logger = logging.getLogger(__name__)
+
 def authenticate():
-    print(f"Authenticating with CLIENT_ID: {CLIENT_ID}")
-    print(f"TENANT_ID: {TENANT_ID}")
-    print(f"Cache file: {CACHE_FILE}")
+    logger.info("Authenticating with CLIENT_ID: %s", CLIENT_ID)
+    logger.info("TENANT_ID: %s", TENANT_ID)
+    logger.info("Cache file: %s", CACHE_FILE)
 
     cache = msal.SerializableTokenCache()
 
@@ -32,7 +31,7 @@ def authenticate():
             with open(CACHE_FILE, "r", encoding="utf-8") as f:
                 cache.deserialize(f.read())
         except Exception as e:
-            print(f"⚠️ Could not read token cache: {e}")
+            logger.warning("⚠️ Could not read token cache: %s", e)
 
     app = msal.PublicClientApplication(
         CLIENT_ID,
@@ -42,35 +41,37 @@ def authenticate():
 
     accounts = app.get_accounts()
     if accounts:
-        print(f"Found {len(accounts)} account(s), trying to acquire token silently...")
+        logger.info("Found %d account(s), trying to acquire token silently...", len(accounts))
         token_response = app.acquire_token_silent(
             ["Files.Read.All", "Files.ReadWrite", "Files.ReadWrite.All", "Mail.Send"],
             account=accounts[0]
         )
     else:
-        print("No existing account found.")
+        logger.info("No existing account found.")
         token_response = None
 
     if not token_response or 'access_token' not in token_response:
-        print("No valid token found. Starting interactive authentication...")
+        logger.info("No valid token found. Starting interactive authentication...")
         token_response = app.acquire_token_interactive(
             scopes=["Files.Read.All", "Files.ReadWrite", "Files.ReadWrite.All", "Mail.Send"]
         )
 
     if token_response and 'access_token' in token_response:
-        print("✅ Authentication successful!")
+        logger.info("✅ Authentication successful!")
         if cache.has_state_changed:
             os.makedirs(os.path.dirname(CACHE_FILE), exist_ok=True)
             with open(CACHE_FILE, "w", encoding="utf-8") as f:
                 f.write(cache.serialize())
-            print(f"✅ Token cache saved to: {CACHE_FILE}")
+            logger.info("✅ Token cache saved to: %s", CACHE_FILE)
         else:
-            print("ℹ️  Cache unchanged, no need to save.")
+            logger.info("ℹ️  Cache unchanged, no need to save.")
         return True
 
-    print("❌ Authentication failed!")
-    print(f"Error: {token_response.get('error_description', 'Unknown error') if token_response else 'No response'}")
+    logger.error("❌ Authentication failed!")
+    logger.error("Error: %s", token_response.get('error_description', 'Unknown error') if token_response else 'No response')
     return False
 
 if __name__ == "__main__":
+    # This is an interactive script, so show progress by default
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"), format="%(message)s")
     authenticate()
\ No newline at end of file
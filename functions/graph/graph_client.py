@@ -1,11 +1,19 @@
 import os
-import json
+import orjson
+import asyncio
+import aiohttp
 import requests
+from requests.adapters import HTTPAdapter
 import msal
 import dotenv
 import time
+import logging
+import random
+import tempfile
 from datetime import datetime, timedelta
 
+logger = logging.getLogger(__name__)
+
 ENV_FILE = os.path.join(os.path.dirname(__file__), "config.env")
 dotenv.load_dotenv(ENV_FILE)
 
@@ -13,10 +21,127 @@ CLIENT_ID = os.getenv("MS_CLIENT_ID")
 TENANT_ID = os.getenv("MS_TENANT_ID")
 SENDER_EMAIL = os.getenv("SENDER_EMAIL")  # optional; not used with /me/sendMail
 CACHE_FILE = os.path.join(os.path.dirname(__file__), "msal_token_cache.bin")
-MAX_RETRIES = 3 # Maximum number of retries for each API call
+MAX_RETRIES = 3 # Maximum number of attempts for each API call
+RETRY_BASE_DELAY = 1.0 # Initial backoff in seconds, doubled on every attempt
+RETRY_MAX_DELAY = 30 # Upper bound for a single backoff sleep
+RETRY_JITTER = 0.5 # Up to +50% random jitter on top of the backoff
+BATCH_SIZE = 20 # Graph caps $batch at 20 sub-requests
+APPEND_CHUNK_SIZE = 1000 # Rows per rows/add call, keeps payloads well under Graph's size limit
+BATCH_CONCURRENCY = 5 # $batch chunks in flight at once for async updates
+CIRCUIT_THRESHOLD = 3 # Consecutive throttled responses before the circuit opens
+CIRCUIT_COOLDOWN = 60 # Seconds the circuit stays open
+LOCK_ERROR = "EditModeCannotAcquireLockTooManyRequests"
+TOKEN_REFRESH_MARGIN = 60 # Seconds before expiry at which the token is refreshed
+POOL_CONNECTIONS = 10 # Number of connection pools to cache
+POOL_MAXSIZE = 20 # Maximum number of connections kept alive per pool
+
+# Shared by every $batch sub-request; never mutated.
+_HDRS = {"Content-Type": "application/json"}
 
 # Keep scopes in one place and use the same set for silent + interactive.
-SCOPES = ["Files.Read.All", "Files.ReadWrite", "Files.ReadWrite.All", "Mail.Send"]
+SCOPES = ("Files.Read.All", "Files.ReadWrite", "Files.ReadWrite.All", "Mail.Send")
+
+GRAPH_BASE = "https://graph.microsoft.com/v1.0"
+_USED_RANGE = GRAPH_BASE + "/me/drive/items/{item}/workbook/worksheets/{ws}/usedRange"
+_SORT_APPLY = _USED_RANGE + "/sort/apply"
+_TABLES = GRAPH_BASE + "/me/drive/items/{item}/workbook/tables"
+_TABLE_ROWS_ADD = _TABLES + "/{table}/rows/add"
+_SEND_MAIL = GRAPH_BASE + "/me/sendMail"
+_BATCH = GRAPH_BASE + "/$batch"
+
+class GraphError(RuntimeError):
+    """
+    Base class for failed Microsoft Graph calls. status_code is None when no response was involved.
+    """
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+class GraphThrottled(GraphError):
+    """
+    Graph kept throttling the request, or the client's circuit breaker is open.
+    """
+
+class GraphAuthError(GraphError):
+    """
+    No usable access token could be obtained, or Graph rejected it.
+    """
+
+class GraphClientError(GraphError):
+    """
+    Graph rejected the request with a 4xx status; retrying won't help.
+    """
+
+class GraphServerError(GraphError):
+    """
+    Graph kept failing with a 5xx status.
+    """
+
+def _error_for_status(status_code, message):
+    if status_code == 401:
+        return GraphAuthError(message, status_code)
+    if status_code == 429:
+        return GraphThrottled(message, status_code)
+    if 400 <= status_code < 500:
+        return GraphClientError(message, status_code)
+    if status_code >= 500:
+        return GraphServerError(message, status_code)
+    return GraphError(message, status_code)
+
+def _error_of(content):
+    """
+    Return the Graph "error" object from an error response body, or None.
+    """
+    try:
+        body = orjson.loads(content)
+    except orjson.JSONDecodeError:
+        return None
+    return body.get("error") if isinstance(body, dict) else None
+
+def _is_lock_error(error):
+    # The lock code may sit on the error itself or on a nested innerError
+    while isinstance(error, dict):
+        if error.get("code") == LOCK_ERROR:
+            return True
+        error = error.get("innerError")
+    return False
+
+# (client_id, tenant_id, cache_file) -> (app, cache, cache file mtime)
+# Shared so repeated GraphClient() calls don't rebuild MSAL or re-read the cache.
+_APP_CACHE = {}
+
+def _cache_mtime(cache_file):
+    try:
+        return os.path.getmtime(cache_file)
+    except OSError:
+        return None
+
+def _get_or_create_app(client_id, tenant_id, cache_file):
+    key = (client_id, tenant_id, cache_file)
+    mtime = _cache_mtime(cache_file)
+    cached = _APP_CACHE.get(key)
+    if cached and cached[2] == mtime:
+        return cached[0], cached[1]
+
+    cache = msal.SerializableTokenCache()
+    # Load existing cache (if any)
+    if mtime is not None:
+        try:
+            with open(cache_file, "r", encoding="utf-8") as f:
+                content = f.read()
+                if content.strip():
+                    cache.deserialize(content)
+        except Exception as e:
+            # Corrupt or unreadable cache shouldn't block auth
+            logger.warning("⚠️ Could not read token cache: %s", e)
+
+    app = msal.PublicClientApplication(
+        client_id,
+        authority=f"https://login.microsoftonline.com/{tenant_id}",
+        token_cache=cache,
+    )
+    _APP_CACHE[key] = (app, cache, mtime)
+    return app, cache
 
 class GraphClient:
     def __init__(
@@ -30,35 +155,49 @@ class GraphClient:
         self.tenant_id = tenant_id
         self.cache_file = cache_file
         self.sender_email = sender_email
-        self.cache = msal.SerializableTokenCache()
-        self.max_retries = MAX_RETRIES
+        self.token = None
+        self._token_expires_at = 0.0
+        self._consecutive_throttles = 0
+        self._circuit_open_until = 0.0
 
-
-        # Load existing cache (if any)
-        if os.path.exists(self.cache_file):
-            try:
-                with open(self.cache_file, "r", encoding="utf-8") as f:
-                    content = f.read()
-                    if content.strip():
-                        self.cache.deserialize(content)
-            except Exception as e:
-                # Corrupt or unreadable cache shouldn't block auth
-                print(f"⚠️ Could not read token cache: {e}")
-
-        self.app = msal.PublicClientApplication(
-            self.client_id,
-            authority=f"https://login.microsoftonline.com/{self.tenant_id}",
-            token_cache=self.cache,
+        # One pooled session so every Graph call reuses the same TLS connection
+        self._session = requests.Session()
+        self._session.mount(
+            "https://",
+            HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE, max_retries=0),
         )
+        self._session.headers.update({"Content-Type": "application/json", "Accept-Encoding": "gzip, deflate"})
+
+        self.app, self.cache = _get_or_create_app(self.client_id, self.tenant_id, self.cache_file)
 
         # Acquire a token (silent if possible, otherwise interactive)
         self._get_token_or_authenticate()
 
+    def close(self):
+        self._session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
     def _save_cache_if_changed(self):
         if self.cache.has_state_changed:
             os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
-            with open(self.cache_file, "w", encoding="utf-8") as f:
-                f.write(self.cache.serialize())
+            # Write to a unique temp file and swap it in so readers never see a partial cache
+            fd, tmp_file = tempfile.mkstemp(dir=os.path.dirname(self.cache_file))
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    f.write(self.cache.serialize())
+                os.replace(tmp_file, self.cache_file)
+            except BaseException:
+                os.unlink(tmp_file)
+                raise
+            # Our own write shouldn't force the next client to reload the cache
+            _APP_CACHE[(self.client_id, self.tenant_id, self.cache_file)] = (
+                self.app, self.cache, _cache_mtime(self.cache_file)
+            )
 
     def _get_token_or_authenticate(self):
         accounts = self.app.get_accounts()
@@ -69,178 +208,268 @@ class GraphClient:
             token_response = self.app.acquire_token_interactive(scopes=SCOPES)
 
         if not token_response or "access_token" not in token_response:
-            raise RuntimeError(
+            raise GraphAuthError(
                 f"Authentication failed: {token_response.get('error_description', 'No token returned') if token_response else 'No response'}"
             )
 
         self._save_cache_if_changed()
+        self._set_token(token_response)
+
+    def _set_token(self, token_response):
+        """
+        Store the access token, its expiry and push the bearer onto the session.
+        """
         self.token = token_response["access_token"]
+        # Margin is folded in here so the hot path in _ensure_token is one comparison
+        expires_in = int(token_response.get("expires_in", 3600))
+        self._token_expires_at = time.monotonic() + expires_in - TOKEN_REFRESH_MARGIN
+        self._session.headers.update({"Authorization": f"Bearer {self.token}"})
 
-    def _ensure_token(self):
+    def _ensure_token(self, force_refresh=False):
         """
         Refresh the access token silently when possible.
         Call this before making Graph requests.
         """
+        if not force_refresh and self.token and time.monotonic() < self._token_expires_at:
+            return
+
         accounts = self.app.get_accounts()
         if not accounts:
             # No account loaded for some reason; fall back to full auth
             self._get_token_or_authenticate()
             return
 
-        token_response = self.app.acquire_token_silent(SCOPES, account=accounts[0])
+        token_response = self.app.acquire_token_silent(SCOPES, account=accounts[0], force_refresh=force_refresh)
         if not token_response or "access_token" not in token_response:
             # Silent refresh failed—fall back to interactive
             token_response = self.app.acquire_token_interactive(scopes=SCOPES)
             if not token_response or "access_token" not in token_response:
-                raise RuntimeError(
+                raise GraphAuthError(
                     f"Authentication failed: {token_response.get('error_description', 'No token returned') if token_response else 'No response'}"
                 )
 
         self._save_cache_if_changed()
-        self.token = token_response["access_token"]
+        self._set_token(token_response)
+
+    @staticmethod
+    def _retry_delay(retry_after, attempt):
+        """
+        Seconds to wait before the next attempt: Retry-After if given, else backoff + jitter.
+        """
+        if retry_after and retry_after.isdigit():
+            return int(retry_after)
+        delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt)
+        return delay * (1 + random.uniform(0, RETRY_JITTER))
+
+    def _check_circuit(self):
+        if time.monotonic() < self._circuit_open_until:
+            raise GraphThrottled(
+                f"Graph is throttling this client; retry in {self._circuit_open_until - time.monotonic():.0f} seconds",
+                429,
+            )
 
-    def _auth_headers(self):
+    def _record_status(self, status_code, throttled):
+        """
+        Track consecutive throttled responses and open the circuit after CIRCUIT_THRESHOLD of them.
+        """
+        if throttled:
+            self._consecutive_throttles += 1
+            if self._consecutive_throttles >= CIRCUIT_THRESHOLD:
+                self._circuit_open_until = time.monotonic() + CIRCUIT_COOLDOWN
+        elif 200 <= status_code < 300:
+            self._consecutive_throttles = 0
+
+    def _request_with_retry(self, method, url, retry_server_errors=True, **kwargs):
+        """
+        Perform a Graph request, retrying throttled and 5xx responses with exponential backoff.
+        Retry-After is honored when Graph sends it. Pass retry_server_errors=False for calls
+        that are not safe to repeat; a 5xx may arrive after Graph already applied them.
+        """
+        for attempt in range(MAX_RETRIES):
+            response = self._session.request(method, url, **kwargs)
+            # Only error bodies are inspected; successful payloads may be large
+            throttled = response.status_code == 429 or (
+                response.status_code >= 300 and _is_lock_error(_error_of(response.content))
+            )
+            self._record_status(response.status_code, throttled)
+            if not throttled and (response.status_code < 500 or not retry_server_errors):
+                return response
+            if attempt == MAX_RETRIES - 1:
+                break
+            self._check_circuit()
+            response.close()
+            delay = self._retry_delay(response.headers.get("Retry-After"), attempt)
+            logger.warning("Graph returned %s. Retrying after %.1f seconds...", response.status_code, delay)
+            time.sleep(delay)
+        error = GraphThrottled if throttled else GraphServerError
+        raise error(f"Graph {method} {url} failed after {MAX_RETRIES} attempts: {response.text}", response.status_code)
+
+    def _graph_request(self, method, url, json_body=None, expected=(200,), retry_server_errors=True):
+        """
+        Send an authenticated Graph request with throttling retries and return the decoded body.
+        """
+        self._check_circuit()
         self._ensure_token()
-        return {
-            "Authorization": f"Bearer {self.token}",
-            "Content-Type": "application/json",
-        }
+        data = orjson.dumps(json_body) if json_body is not None else None
+        response = self._request_with_retry(method, url, retry_server_errors, data=data)
+        if response.status_code == 401:
+            # Token was revoked or expired early; refresh it and try once more
+            self._check_circuit()
+            self._ensure_token(force_refresh=True)
+            response = self._request_with_retry(method, url, retry_server_errors, data=data)
+        if response.status_code not in expected:
+            raise _error_for_status(
+                response.status_code, f"Graph {method} {url} failed: {response.status_code} {response.text}"
+            )
+        return orjson.loads(response.content) if response.content else None
 
     def get_excel_rows(self, excel_item_id, excel_worksheet) -> list:
-        headers = {
-            'Authorization': f'Bearer {self.token}',
-            'Content-Type': 'application/json'
-        }
-        url = f"https://graph.microsoft.com/v1.0/me/drive/items/{excel_item_id}/workbook/worksheets/{excel_worksheet}/usedRange"
-        response = requests.get(url, headers=headers)
-        data = response.json() 
-        if response.status_code == 429 and self.max_retries > 0:
-            self.max_retries -= 1
-            retry_after = int(response.headers.get('Retry-After', '30'))
-            print(f"Throttled. Retrying after {retry_after} seconds...")
-            time.sleep(retry_after)
-            return self.get_excel_rows(excel_item_id, excel_worksheet)
-
-        if response.status_code != 200:
-            raise Exception(f"Failed to get Excel rows: {response.text}")
-        rows = (data['values'])
-        return rows
+        url = _USED_RANGE.format(item=excel_item_id, ws=excel_worksheet)
+        return self._graph_request("GET", url)['values']
     
-    def batch_update_excel_rows(self, excel_item_id, excel_worksheet, rows, end_column):
-        headers = {
-            'Authorization': f'Bearer {self.token}',
-            'Content-Type': 'application/json'
-        }
-        request_list = []
-        for id, row in enumerate(rows):
-            row_number = row[0]
-            row_data = row[1]
-            url = f"/me/drive/items/{excel_item_id}/workbook/worksheets('{excel_worksheet}')/range(address='A{row_number}:{end_column}{row_number}')"
-            request_list.append({
-                "id" : str(id + 1),
-                "method": "PATCH",
-                "url" : url,
-                "body": {
-                    "values": [row_data]
-                },
-                "headers" : {
-                    "Content-Type": "application/json"
+    def _batch_bodies(self, excel_item_id, excel_worksheet, rows, end_column):
+        """
+        Split row updates into $batch request bodies of at most BATCH_SIZE sub-requests.
+        Each row is a (row_number, row_data) pair.
+        """
+        # Validate once up front so the loop below can unpack without checks
+        if any(len(row) != 2 for row in rows):
+            raise ValueError("rows must be (row_number, row_data) pairs")
+        url_prefix = f"/me/drive/items/{excel_item_id}/workbook/worksheets('{excel_worksheet}')/range(address='A"
+        url_suffix = f":{end_column}"
+        bodies = []
+        for chunk_idx in range(0, len(rows), BATCH_SIZE):
+            request_list = [
+                {
+                    "id": str(id),
+                    "method": "PATCH",
+                    "url": f"{url_prefix}{row_number}{url_suffix}{row_number}')",
+                    "body": {"values": [row_data]},
+                    "headers": _HDRS,
                 }
-            })
-        url = f"https://graph.microsoft.com/v1.0/$batch"
-        body = {
-            "requests": request_list
-        }
-        response = requests.post(url, headers=headers, json=body)
-        if response.status_code == 429 and self.max_retries > 0:
-            self.max_retries -= 1
-            retry_after = int(response.headers.get('Retry-After', '30'))
-            print(f"Throttled. Retrying after {retry_after} seconds...")
-            time.sleep(retry_after)
-            return self.batch_update_excel_rows(excel_item_id, excel_worksheet, rows, end_column)
-        if response.status_code != 200:
-            raise Exception(f"Failed to batch update Excel: {response.text}")
-        self.max_retries = MAX_RETRIES
-        if "EditModeCannotAcquireLockTooManyRequests" in response.text and self.max_retries > 0:
-            self.max_retries -= 1
-            print("EditModeCannotAcquireLockTooManyRequests")
-            time.sleep(10)
-            return self.batch_update_excel_rows(excel_item_id, excel_worksheet, rows, end_column)
-        self.max_retries = MAX_RETRIES
-        return response.json()
+                # Ids run across the whole call so merged responses map back to their rows
+                for id, (row_number, row_data) in enumerate(rows[chunk_idx:chunk_idx + BATCH_SIZE], chunk_idx + 1)
+            ]
+            bodies.append({"requests": request_list})
+        return bodies
+
+    async def _post_chunk(self, session, sem, body, headers=None):
+        async with sem:
+            for attempt in range(MAX_RETRIES):
+                # Chunks queued on the semaphore must not post once the circuit has opened
+                self._check_circuit()
+                async with session.post(_BATCH, data=orjson.dumps(body), headers=headers) as response:
+                    content = await response.read()
+                    status = response.status
+                    if status == 200:
+                        result = orjson.loads(content)
+                        # A 200 $batch can still carry lock errors in its sub-responses
+                        locked = [
+                            r for r in result.get("responses", [])
+                            if isinstance(r.get("body"), dict) and _is_lock_error(r["body"].get("error"))
+                        ]
+                        throttled = bool(locked)
+                        if locked:
+                            status = locked[0].get("status", status)
+                    else:
+                        throttled = status == 429 or (status >= 300 and _is_lock_error(_error_of(content)))
+                    self._record_status(status, throttled)
+                    if not throttled and status < 500:
+                        if status != 200:
+                            raise _error_for_status(
+                                status, f"Failed to batch update Excel: {status} {content.decode()}"
+                            )
+                        return result
+                    delay = self._retry_delay(response.headers.get("Retry-After"), attempt)
+                if attempt == MAX_RETRIES - 1:
+                    break
+                self._check_circuit()
+                logger.warning("Graph returned %s. Retrying after %.1f seconds...", status, delay)
+                await asyncio.sleep(delay)
+            error = GraphThrottled if throttled else GraphServerError
+            raise error(f"Graph POST {_BATCH} failed after {MAX_RETRIES} attempts: {content.decode()}", status)
+
+    async def batch_update_excel_rows_async(self, excel_item_id, excel_worksheet, rows, end_column, concurrency=BATCH_CONCURRENCY):
+        """
+        Update rows with up to `concurrency` $batch requests in flight at once.
+        """
+        self._check_circuit()
+        self._ensure_token()
+        bodies = self._batch_bodies(excel_item_id, excel_worksheet, rows, end_column)
+        sem = asyncio.Semaphore(concurrency)
+        connector = aiohttp.TCPConnector(limit=concurrency)
+        async with aiohttp.ClientSession(headers=dict(self._session.headers), connector=connector) as session:
+            # Let every chunk finish before the session closes, then report failures together
+            results = await asyncio.gather(
+                *(self._post_chunk(session, sem, body) for body in bodies), return_exceptions=True
+            )
+            expired = [
+                i for i, result in enumerate(results)
+                if isinstance(result, GraphAuthError) and result.status_code == 401
+            ]
+            if expired:
+                # Token was revoked or expired early; refresh it and re-post those chunks once.
+                # The session copied the old Authorization header, so the new one is passed per request.
+                self._ensure_token(force_refresh=True)
+                auth = {"Authorization": self._session.headers["Authorization"]}
+                retried = await asyncio.gather(
+                    *(self._post_chunk(session, sem, bodies[i], auth) for i in expired), return_exceptions=True
+                )
+                for i, result in zip(expired, retried):
+                    results[i] = result
+        failed = [(body, result) for body, result in zip(bodies, results) if isinstance(result, BaseException)]
+        if failed:
+            first = failed[0][1]
+            ranges = ", ".join(f"{body['requests'][0]['id']}-{body['requests'][-1]['id']}" for body, _ in failed)
+            error = type(first) if isinstance(first, GraphError) else GraphError
+            raise error(
+                f"Batch update failed for {len(failed)} of {len(bodies)} chunks (sub-request ids {ranges}); "
+                f"the other chunks were applied. First error: {first}",
+                getattr(first, "status_code", None),
+            ) from first
+        return {"responses": [r for result in results for r in result["responses"]]}
+
+    def batch_update_excel_rows(self, excel_item_id, excel_worksheet, rows, end_column):
+        return asyncio.run(self.batch_update_excel_rows_async(excel_item_id, excel_worksheet, rows, end_column))
     
     def reorder_excel_rows(self, excel_item_id, excel_worksheet, fields):
-        headers = {
-            'Authorization': f'Bearer {self.token}',
-            'Content-Type': 'application/json'
-        }
-        url = f"https://graph.microsoft.com/v1.0/me/drive/items/{excel_item_id}/workbook/worksheets/{excel_worksheet}/usedRange/sort/apply"
-        body = {
-            "fields": fields
-        }
-        response = requests.post(url, headers=headers, json=body)
-        if response.status_code == 429 and self.max_retries > 0:
-            self.max_retries -= 1
-            retry_after = int(response.headers.get('Retry-After', '30'))
-            print(f"Throttled. Retrying after {retry_after} seconds...")
-            time.sleep(retry_after)
-            return self.reorder_excel_rows(excel_item_id, excel_worksheet, fields)
-        if response.status_code != 200:
-            raise Exception(f"Failed to reorder Excel rows: {response.text}")
-        self.max_retries = MAX_RETRIES
-        return response.json()
+        url = _SORT_APPLY.format(item=excel_item_id, ws=excel_worksheet)
+        return self._graph_request("POST", url, {"fields": fields})
         
     def append_rows_to_table(self, excel_item_id, table_name, rows):
-        headers = {
-            'Authorization': f'Bearer {self.token}',
-            'Content-Type': 'application/json'
-        }
-        url = f"https://graph.microsoft.com/v1.0/me/drive/items/{excel_item_id}/workbook/tables/{table_name}/rows/add"
-        body = {
-            "values": rows
-        }
-        response = requests.post(url, headers=headers, json=body)
-        if response.status_code == 429 and self.max_retries > 0:
-            self.max_retries -= 1
-            retry_after = int(response.headers.get('Retry-After', '30'))
-            print(f"Throttled. Retrying after {retry_after} seconds...")
-            time.sleep(retry_after)
-            return self.append_rows_to_table(excel_item_id, table_name, rows)
-        if "EditModeCannotAcquireLockTooManyRequests" in response.text and self.max_retries > 0:
-            self.max_retries -= 1
-            print("EditModeCannotAcquireLockTooManyRequests")
-            time.sleep(10)
-            return self.append_rows_to_table(excel_item_id, table_name, rows)
-        if response.status_code != 201:
-            raise Exception(f"Failed to append rows: {response.text}")
-        self.max_retries = MAX_RETRIES
-        return response.json()    
+        """
+        Append rows in APPEND_CHUNK_SIZE chunks and return the first chunk's
+        result with the values of every chunk merged into it.
+        """
+        url = _TABLE_ROWS_ADD.format(item=excel_item_id, table=table_name)
+        if not rows:
+            # Keep the single-POST behaviour for an empty append
+            return self._graph_request("POST", url, {"values": rows}, expected=(201,), retry_server_errors=False)
+        result = None
+        for chunk_idx in range(0, len(rows), APPEND_CHUNK_SIZE):
+            chunk = rows[chunk_idx:chunk_idx + APPEND_CHUNK_SIZE]
+            try:
+                response = self._graph_request("POST", url, {"values": chunk}, expected=(201,), retry_server_errors=False)
+            except GraphError as e:
+                raise type(e)(
+                    f"Appending rows failed after {chunk_idx} of {len(rows)} rows were appended: {e}",
+                    e.status_code,
+                ) from e
+            if result is None:
+                result = response
+            else:
+                result.setdefault("values", []).extend(response.get("values", []))
+        return result
     
     def list_tables(self, excel_item_id):
-        headers = {
-            'Authorization': f'Bearer {self.token}',
-            'Content-Type': 'application/json'
-        }
-        url = f"https://graph.microsoft.com/v1.0/me/drive/items/{excel_item_id}/workbook/tables"
-        response = requests.get(url, headers=headers)
-        if response.status_code == 429 and self.max_retries > 0:
-            self.max_retries -= 1
-            retry_after = int(response.headers.get('Retry-After', '30'))
-            print(f"Throttled. Retrying after {retry_after} seconds...")
-            time.sleep(retry_after)
-            return self.list_tables(excel_item_id)
-        if response.status_code != 200:
-            raise Exception(f"Failed to list tables: {response.text}")
-        self.max_retries = MAX_RETRIES
-        return response.json().get('value', [])
+        url = _TABLES.format(item=excel_item_id)
+        return self._graph_request("GET", url).get('value', [])
     
     def send_email(self, recipient_email: str, subject: str, body: str, save_to_sent=True):
         """
         Sends an email as the signed-in user.
         Note: do NOT set 'from' when using /me/sendMail.
         """
-        headers = self._auth_headers()
-        url = "https://graph.microsoft.com/v1.0/me/sendMail"
         payload = {
             "message": {
                 "subject": subject,
@@ -249,7 +478,5 @@ class GraphClient:
             },
             "saveToSentItems": bool(save_to_sent),
         }
-        resp = requests.post(url, headers=headers, json=payload)
-        if resp.status_code not in (202, 200):
-            raise Exception(f"Failed to send email: {resp.status_code} {resp.text}")
+        self._graph_request("POST", _SEND_MAIL, payload, expected=(202, 200), retry_server_errors=False)
         return True
\ No newline at end of file
@@ -2,6 +2,9 @@
 # To get started, simply uncomment the below code or create your own.
 # Deploy with `firebase deploy`
 
+import os
+import logging
+
 from firebase_functions import https_fn
 from firebase_functions.options import set_global_options
 from firebase_admin import initialize_app
@@ -15,6 +18,9 @@ set_global_options(max_instances=1)
 
 initialize_app()
 
+# Keep Graph client chatter out of the logs unless LOG_LEVEL asks for it.
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "WARNING"))
+
 @https_fn.on_request()
 def on_request_example(req: https_fn.Request) -> https_fn.Response:
     if req.method != "GET":
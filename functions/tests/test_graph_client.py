@@ -0,0 +1,99 @@
+import asyncio
+import time
+import unittest
+from unittest import mock
+
+import orjson
+
+import graph.graph_client as graph_client
+
+
+class FakeResponse:
+    def __init__(self, status, body=None):
+        self.status = status
+        self.headers = {}
+        self._content = orjson.dumps(body) if body is not None else b""
+
+    async def read(self):
+        return self._content
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeSession:
+    """
+    Stands in for aiohttp.ClientSession, answering each POST from `responder`.
+    """
+    def __init__(self, responder):
+        self.responder = responder
+        self.posts = []
+
+    def __call__(self, *args, **kwargs):
+        return self
+
+    def post(self, url, data=None, headers=None):
+        self.posts.append((url, orjson.loads(data), headers))
+        return FakeResponse(*self.responder(orjson.loads(data), headers))
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+def make_client():
+    # Skip __init__ so no MSAL app or interactive auth is involved
+    client = graph_client.GraphClient.__new__(graph_client.GraphClient)
+    client.token = "token"
+    client._token_expires_at = time.monotonic() + 3600
+    client._consecutive_throttles = 0
+    client._circuit_open_until = 0.0
+    client._session = mock.Mock(headers={"Authorization": "Bearer token"})
+    return client
+
+
+def run_batch(client, session, row_count):
+    rows = [(n, [n]) for n in range(2, row_count + 2)]
+    with mock.patch.object(graph_client.aiohttp, "ClientSession", session), \
+            mock.patch.object(graph_client.asyncio, "sleep", mock.AsyncMock()):
+        return asyncio.run(client.batch_update_excel_rows_async("item", "Sheet1", rows, "C", concurrency=1))
+
+
+class BatchUpdateAsyncTests(unittest.TestCase):
+    def test_queued_chunks_skip_posting_once_circuit_opens(self):
+        client = make_client()
+        session = FakeSession(lambda body, headers: (429, {"error": {"code": "TooManyRequests"}}))
+
+        with self.assertRaises(graph_client.GraphThrottled):
+            run_batch(client, session, 1000)
+
+        # Only the first chunk's attempts reach Graph; the 49 queued chunks are shed
+        self.assertEqual(len(session.posts), graph_client.CIRCUIT_THRESHOLD)
+
+    def test_chunks_rejected_with_401_are_reposted_with_refreshed_token(self):
+        client = make_client()
+
+        def refresh(force_refresh=False):
+            client._session.headers["Authorization"] = "Bearer fresh"
+
+        def respond(body, headers):
+            if headers is None:
+                return 401, {"error": {"code": "InvalidAuthenticationToken"}}
+            return 200, {"responses": [{"id": r["id"], "status": 200} for r in body["requests"]]}
+
+        session = FakeSession(respond)
+        with mock.patch.object(client, "_ensure_token", side_effect=refresh) as ensure_token:
+            result = run_batch(client, session, 25)
+
+        ensure_token.assert_any_call(force_refresh=True)
+        self.assertEqual([r["id"] for r in result["responses"]], [str(n) for n in range(1, 26)])
+        self.assertEqual([headers for _, _, headers in session.posts[2:]], [{"Authorization": "Bearer fresh"}] * 2)
+
+
+if __name__ == "__main__":
+    unittest.main()